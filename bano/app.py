@@ -3,7 +3,7 @@ import os
 import csv
 import io
 import logging
-import re
+import time
 
 import elasticsearch
 from elasticsearch_dsl import Search, Q
@@ -11,11 +11,15 @@ from elasticsearch_dsl.filter import F
 from elasticsearch_dsl.query import Match, Filtered, MatchAll
 from flask import Flask, render_template, request, abort, Response
 
+from .normalize import (canonical_key, match_address, preprocess,
+                        strip_housenumber, strip_numbers)
+
 
 app = Flask(__name__)
 PORT = os.environ.get('BANO_PORT', 5001)
 HOST = os.environ.get('BANO_HOST', '0.0.0.0')
 API_URL = os.environ.get('API_URL', '/search/?')
+AUTOCOMPLETE_URL = os.environ.get('AUTOCOMPLETE_URL', '/autocomplete/?')
 CENTER = [
     float(os.environ.get('BANO_MAP_LAT', 48.7833)),
     float(os.environ.get('BANO_MAP_LON', 2.2220))
@@ -26,13 +30,84 @@ TILELAYER = os.environ.get(
 )
 MAXZOOM = os.environ.get('BANO_MAP_MAXZOOM', 19)
 INDEX = os.environ.get('BANO_INDEX', 'bano')
-
-es = elasticsearch.Elasticsearch(timeout=999999999)
+# Distances of the rings tried in turn around lon/lat before searching
+# the whole index, and the number of hits that stops the expansion.
+GEO_RINGS = [r for r in os.environ.get('BANO_GEO_RINGS', '5km,50km').split(',')
+             if r]
+GEO_RINGS_MIN_HITS = int(os.environ.get('BANO_GEO_RINGS_MIN_HITS', 5))
+# Number of items of a /batch/search/ request sent together in each msearch.
+BATCH_CHUNK = int(os.environ.get('BANO_BATCH_CHUNK', 100))
+# Overall deadline, in milliseconds, of a /search/ or /reverse/ request, and
+# of a whole /csv/ file.
+TIME_BUDGET = int(os.environ.get('BANO_TIME_BUDGET', 2000))
+CSV_TIME_BUDGET = int(os.environ.get('BANO_CSV_TIME_BUDGET', 300000))
+# Deadline of a /batch/search/ chunk, per item of the chunk.
+BATCH_ITEM_TIME_BUDGET = int(os.environ.get('BANO_BATCH_ITEM_TIME_BUDGET',
+                                            200))
+# A stage of the cascade is skipped when less than this is left.
+MIN_STAGE_TIME = int(os.environ.get('BANO_MIN_STAGE_TIME', 20))
+# Max number of documents collected per shard, 0 to disable.
+TERMINATE_AFTER = int(os.environ.get('BANO_TERMINATE_AFTER', 0))
+# Default client timeout, in seconds, for calls made without a budget.
+ES_TIMEOUT = int(os.environ.get('BANO_ES_TIMEOUT', 30))
+
+_es = None
+
+
+def get_es():
+    # Created on first use, so importing the app does not open connections.
+    global _es
+    if _es is None:
+        _es = elasticsearch.Elasticsearch(timeout=ES_TIMEOUT)
+    return _es
+
+
+class TimeBudget(object):
+    """Deadline of a request, shared among the ES calls it makes."""
+
+    def __init__(self, milliseconds):
+        self.deadline = time.monotonic() + milliseconds / 1000
+        self.partial = False
+
+    def remaining(self):
+        """Milliseconds left before the deadline."""
+        return max(int((self.deadline - time.monotonic()) * 1000), 0)
+
+    def allows(self, milliseconds=MIN_STAGE_TIME):
+        """Tell if a stage fits in what remains, flag the request as
+        partial otherwise."""
+        if self.remaining() < milliseconds:
+            self.partial = True
+            return False
+        return True
+
+    def share(self, stages=1):
+        """Milliseconds granted to the next call: what remains divided by
+        `stages`. A cascade passes 2 (half of what remains) until its last
+        stage: the first stages are the ones that usually find something."""
+        remaining = self.remaining()
+        return min(max(remaining // stages, MIN_STAGE_TIME), remaining)
+
+    def timeout(self, stages=1):
+        """ES timeout of the next call. It is best effort, so keep some of
+        the share for ES to send back what it has collected."""
+        return '{}ms'.format(int(self.share(stages) * 0.8))
+
+    def request_timeout(self, stages=1):
+        """Client timeout of the next call, in seconds: the hard bound."""
+        return self.share(stages) / 1000
+
+    def check(self, response):
+        """Flag the request as partial if ES timed out."""
+        if response.get('timed_out'):
+            self.partial = True
 
 
 class NotFoundLogHandler(logging.FileHandler):
 
-    def __init__(filename, *args, **kwargs):
+    def __init__(self, *args, **kwargs):
+        # delay: the file is only opened when the first query is logged.
+        kwargs.setdefault('delay', True)
         super().__init__('notfound.log', *args, **kwargs)
 
 
@@ -46,16 +121,18 @@ def index():
     return render_template(
         'index.html',
         API_URL=API_URL,
+        AUTOCOMPLETE_URL=AUTOCOMPLETE_URL,
         CENTER=CENTER,
         TILELAYER=TILELAYER,
         MAXZOOM=MAXZOOM
     )
 
 
-def make_query(q, lon=None, lat=None, match_all=True, limit=15, filters=None):
+def make_query(q, lon=None, lat=None, match_all=True, limit=15, filters=None,
+               distance=None, timeout=None):
     if filters is None:
         filters = {}
-    s = Search(es).index(INDEX)
+    s = Search(get_es()).index(INDEX)
     should_match = '100%' if match_all else '2<-1 6<-2 8<-3 10<-50%'
     match = Q(
         'bool',
@@ -123,6 +200,15 @@ def make_query(q, lon=None, lat=None, match_all=True, limit=15, filters=None):
     )
 
     s = s.query(fscore)
+    if distance and lon is not None and lat is not None:
+        # Cheap filter, so ES only scores the candidates around the point.
+        # Municipalities always get through: "lyon" searched around Paris
+        # must still find the city, not only the nearby "Rue de Lyon".
+        s = s.filter(F('or', [
+            F('geo_distance', distance=distance,
+              coordinate={'lat': lat, 'lon': lon}),
+            F('range', importance={'gt': 0}),
+        ]))
     # Only filter out 'house' if we are not explicitly asking for this
     # type.
     if filters.get('type') is not 'housenumber':
@@ -145,81 +231,132 @@ def make_query(q, lon=None, lat=None, match_all=True, limit=15, filters=None):
         # the index instead.
         for k, v in filters.items():
             s = s.query({'match': {k: v}})
+    if timeout:
+        # ES returns the hits collected so far when the timeout is reached.
+        s = s.extra(timeout=timeout)
+    if TERMINATE_AFTER:
+        s = s.extra(terminate_after=TERMINATE_AFTER)
     return s.extra(size=limit)
 
 
-def query_index(q, lon, lat, match_all=True, limit=15, filters=None):
-    s = make_query(q, lon, lat, match_all, limit, filters)
+def query_index(q, lon, lat, match_all=True, limit=15, filters=None,
+                distance=None, timeout=None, request_timeout=None):
+    s = make_query(q, lon, lat, match_all, limit, filters, distance, timeout)
+    if request_timeout:
+        s = s.params(request_timeout=request_timeout)
     stdout(json.dumps(s.to_dict()))
     return s.execute()
 
 
-@app.route('/search/')
-def search():
-
+def search_plan(query, lon=None, lat=None, limit=15):
+    """Yield the (q, match_all, distance, enough) steps of the fallback
+    cascade. The search stops at the first step with `enough` hits."""
+    # Location biased search: the first step tries expanding rings around
+    # the point, and stops as soon as it has enough hits. The fallback steps
+    # are rarely needed, they search the whole index right away.
+    rings = GEO_RINGS if lon is not None and lat is not None else []
+    enough = min(limit, GEO_RINGS_MIN_HITS)
+
+    def steps():
+        # Keep the raw text otherwise: the ES analyzers expect it, e.g. they
+        # split "1er" before applying the synonyms.
+        cleaned = preprocess(query)
+        yield cleaned, True
+        # Try without any number.
+        no_num = strip_numbers(cleaned)
+        if no_num and no_num != cleaned:
+            yield no_num, True
+        # Try matching a standard address pattern.
+        match = match_address(cleaned)
+        # Same query than the last step: no need to hit ES twice.
+        if match and match != cleaned:
+            yield match, False
+        # No result could be found, query index again and don't expect to
+        # match all search terms.
+        yield cleaned, False
+
+    for i, (q, match_all) in enumerate(steps()):
+        if i == 0:
+            for distance in rings:
+                yield q, match_all, distance, enough
+        yield q, match_all, None, 1
+
+
+def parse_search_args(args):
+    """Extract (query, lon, lat, limit, filters) from /search/ like args.
+
+    Raise ValueError for a filter value that is neither a string nor a
+    number (JSON clients may send {"postcode": 75001}).
+    """
     try:
-        lon = float(request.args.get('lon'))
-        lat = float(request.args.get('lat'))
+        lon = float(args.get('lon'))
+        lat = float(args.get('lat'))
     except (TypeError, ValueError):
         lon = lat = None
 
     try:
-        limit = min(int(request.args.get('limit')), 50)
+        limit = max(min(int(args.get('limit')), 50), 1)
     except (TypeError, ValueError):
         limit = 15
 
-    query = request.args.get('q')
-    if not query:
-        abort(400, "missing search term 'q': /?q=berlin")
-
     filters = {}
     keys = ['type', 'city', 'postcode', 'housenumber', 'street']
     nested = ['street', 'city']
     for key in keys:
-        value = request.args.get(key)
-        if value:
-            if key in nested:
-                key = '{}.default'.format(key)
-            filters[key] = value
-
-    stdout('Trying with', query)
-    results = query_index(query, lon, lat, limit=limit, filters=filters)
-
-    if len(results.hits) < 1:
-        query = preprocess(query)
-        stdout('Trying with', query)
-        results = query_index(query, lon, lat,
-                              match_all=True, limit=limit, filters=filters)
-
-    if len(results.hits) < 1:
-        # Try without any number.
-        no_num = re.sub('[\d]*', '', query)
-        stdout('Trying with', no_num)
-        results = query_index(no_num, lon, lat,
-                              match_all=True, limit=limit, filters=filters)
-
-    if len(results.hits) < 1:
-        # Try matching a standard address pattern.
-        match = match_address(query)
-        if match:
-            stdout('Trying with', match)
-            results = query_index(match, lon, lat,
-                                  match_all=False, limit=limit,
-                                  filters=filters)
-
-    if len(results.hits) < 1:
-        # No result could be found, query index again and don't expect to match
-        # all search terms.
-        stdout('Trying with match_all=False', query)
-        results = query_index(query, lon, lat,
-                              match_all=False, limit=limit, filters=filters)
-
-    if len(results.hits) < 1:
+        value = args.get(key)
+        if value is None or value == '':
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        if not isinstance(value, str):
+            raise ValueError("invalid value for '{}'".format(key))
+        if key in nested:
+            key = '{}.default'.format(key)
+        filters[key] = value
+
+    return args.get('q'), lon, lat, limit, filters
+
+
+@app.route('/search/')
+def search():
+
+    try:
+        query, lon, lat, limit, filters = parse_search_args(request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    if not query:
+        abort(400, "missing search term 'q': /?q=berlin")
+
+    budget = TimeBudget(TIME_BUDGET)
+    hits = []
+    plan = list(search_plan(query, lon, lat, limit))
+    for i, (q, match_all, distance, enough) in enumerate(plan):
+        if not budget.allows():
+            stdout('Out of time budget, skipping', q, match_all, distance)
+            break
+        stages = 1 if i == len(plan) - 1 else 2
+        stdout('Trying with', q, match_all, distance)
+        try:
+            results = query_index(
+                q, lon, lat, match_all=match_all, limit=limit,
+                filters=filters, distance=distance,
+                timeout=budget.timeout(stages),
+                request_timeout=budget.request_timeout(stages))
+        except elasticsearch.ConnectionTimeout:
+            budget.partial = True
+            continue
+        budget.check(results)
+        hits = results.hits
+        if len(hits) >= enough:
+            break
+
+    if len(hits) < 1:
         notfound.debug(query)
 
     debug = 'debug' in request.args
-    data = to_geo_json(results, debug=debug)
-    data['query'] = request.args.get('q')
+    data = to_geo_json(hits, debug=debug)
+    data['query'] = query
+    data['partial'] = budget.partial
     data['version'] = '0.0.1'
     data = json.dumps(data, indent=4 if debug else None)
     response = Response(data, mimetype='application/json')
@@ -227,6 +364,184 @@ def search():
     return response
 
 
+@app.route('/autocomplete/')
+def autocomplete():
+    # Keystroke oriented: one call to the completion suggester, no fuzziness,
+    # no scoring script and no fallback cascade. Use /search/ for precise
+    # geocoding. Housenumbers are not in the suggester, so "12 rue ..." is
+    # completed with the streets.
+    try:
+        query, _, _, limit, _ = parse_search_args(request.args)
+    except ValueError as e:
+        abort(400, str(e))
+    if not query:
+        abort(400, "missing search term 'q': /?q=berlin")
+
+    debug = 'debug' in request.args
+    budget = TimeBudget(TIME_BUDGET)
+    text = strip_housenumber(query)
+    options = []
+    try:
+        if text:
+            body = {
+                'place': {
+                    'text': text,
+                    'completion': {'field': 'suggest', 'size': limit}
+                }
+            }
+            results = get_es().suggest(
+                index=INDEX, body=body,
+                request_timeout=budget.request_timeout())
+            if results.get('place'):
+                options = results['place'][0]['options']
+        data = suggest_to_geo_json(options)
+    except elasticsearch.ConnectionTimeout:
+        budget.partial = True
+        data = to_geo_json([])
+    # index.html uses it to drop the responses of superseded keystrokes.
+    data['query'] = query
+    data['partial'] = budget.partial
+    data['version'] = '0.0.1'
+    data = json.dumps(data, indent=4 if debug else None)
+    response = Response(data, mimetype='application/json')
+    cors(response)
+    return response
+
+
+def parse_batch(data):
+    """Accept a JSON array or NDJSON of search requests (objects with the
+    same keys as /search/ args, or plain query strings)."""
+    data = data.strip()
+    if data.startswith('['):
+        items = json.loads(data)
+    else:
+        items = [json.loads(line) for line in data.splitlines()
+                 if line.strip()]
+    return [{'q': item} if isinstance(item, str) else item for item in items]
+
+
+def batch_search(items, debug=False):
+    """Run the /search/ cascade for each item, sending each round of the
+    cascade for a chunk of items in a single msearch, and yield the results
+    in order."""
+    for start in range(0, len(items), BATCH_CHUNK):
+        chunk = items[start:start + BATCH_CHUNK]
+        # Items with the same canonical query and args share a task, so they
+        # are only searched once.
+        tasks = {}
+        states = []
+        for item in chunk:
+            if not isinstance(item, dict):
+                states.append({'error': 'invalid search request'})
+                continue
+            try:
+                query, lon, lat, limit, filters = parse_search_args(item)
+            except ValueError as e:
+                states.append({'error': str(e)})
+                continue
+            if not query or not isinstance(query, str):
+                states.append({'error': "missing search term 'q'"})
+                continue
+            key = (canonical_key(query), lon, lat, limit,
+                   json.dumps(filters, sort_keys=True))
+            if key not in tasks:
+                tasks[key] = {
+                    'args': (lon, lat, limit, filters),
+                    'plan': list(search_plan(query, lon, lat, limit)),
+                    'step': 0,
+                    'hits': [],
+                    'partial': False,
+                    'done': False,
+                }
+            states.append({'query': query, 'task': tasks[key]})
+        pending = list(tasks.values())
+        # The chunk shares one budget, split among its cascade rounds.
+        budget = TimeBudget(BATCH_ITEM_TIME_BUDGET * len(chunk))
+        while pending:
+            if not budget.allows():
+                for task in pending:
+                    task['partial'] = True
+                break
+            last = all(len(task['plan']) - task['step'] <= 1
+                       for task in pending)
+            stages = 1 if last else 2
+            body = []
+            running = []
+            for task in pending:
+                if task['step'] >= len(task['plan']):
+                    task['done'] = True
+                    continue
+                q, match_all, distance, enough = task['plan'][task['step']]
+                task['step'] += 1
+                lon, lat, limit, filters = task['args']
+                query = make_query(q, lon, lat, match_all, limit, filters,
+                                   distance, timeout=budget.timeout(stages))
+                body.append({'index': INDEX})
+                body.append(query.to_dict())
+                running.append((task, enough))
+            try:
+                responses = []
+                if body:
+                    responses = get_es().msearch(
+                        body, request_timeout=budget.request_timeout(stages)
+                    )['responses']
+            except elasticsearch.ConnectionTimeout:
+                # Keep the hits of the previous rounds, and go on with the
+                # next step if the budget allows it.
+                for task, enough in running:
+                    task['partial'] = True
+                responses = []
+            except elasticsearch.TransportError as e:
+                # Only the items of this chunk fail, the stream goes on.
+                error = {'error': 'search failed: {}'.format(e)}
+                responses = [error] * len(running)
+            for (task, enough), response in zip(running, responses):
+                if 'error' in response:
+                    task['error'] = response['error']
+                    task['done'] = True
+                    continue
+                if response.get('timed_out'):
+                    task['partial'] = True
+                task['hits'] = response['hits']['hits']
+                if len(task['hits']) >= enough:
+                    task['done'] = True
+            pending = [task for task in pending if not task['done']]
+        for state in states:
+            task = state.get('task', state)
+            if 'error' in task:
+                yield {'error': task['error'], 'query': state.get('query')}
+                continue
+            if not task['hits']:
+                notfound.debug(state['query'])
+            sources = [hit['_source'] for hit in task['hits']]
+            data = to_geo_json(sources, debug=debug)
+            data['query'] = state['query']
+            data['partial'] = task['partial']
+            data['version'] = '0.0.1'
+            yield data
+
+
+@app.route('/batch/search/', methods=['POST', 'OPTIONS'])
+def _batch_search():
+    if request.method == 'OPTIONS':
+        response = Response('')
+        cors(response)
+        return response
+    try:
+        items = parse_batch(request.get_data(as_text=True))
+    except ValueError:
+        abort(400, "expecting a JSON array or NDJSON of search requests")
+    debug = 'debug' in request.args
+
+    def stream():
+        for data in batch_search(items, debug=debug):
+            yield json.dumps(data) + '\n'
+
+    response = Response(stream(), mimetype='application/x-ndjson')
+    cors(response)
+    return response
+
+
 @app.route('/csv/', methods=['GET', 'POST', 'OPTIONS'])
 def _csv():
     if request.method == 'POST':
@@ -240,26 +555,56 @@ def _csv():
         rows = csv.DictReader(content, fieldnames=headers, dialect=dialect)
         search = []
         queries = []
+        # Rows with the same canonical key give the same query once analyzed
+        # by ES, so they are only sent once.
+        keys = {}
         for row in rows:
             q = ' '.join({k: row[k] for k in columns}.values())
-            queries.append(q)
-            query = make_query(q, limit=1, match_all=match_all)
+            key = canonical_key(q)
+            queries.append((q, key))
+            if key in keys:
+                continue
+            keys[key] = len(keys)
+            query = make_query(preprocess(q), limit=1, match_all=match_all)
             search.append({'index': INDEX})
             search.append(query.to_dict())
+        budget = TimeBudget(CSV_TIME_BUDGET)
         responses = []
         start = 0
         step = 200
-        while start <= len(search):
+        while start < len(search):
+            if not budget.allows():
+                # Remaining rows are written back without any result.
+                break
+            # Split what is left among the remaining chunks.
+            stages = -(-(len(search) - start) // step)
             chunk = search[start:start + step]
             start += step
-            responses.extend(es.msearch(chunk)['responses'])
+            for body in chunk[1::2]:
+                body['timeout'] = budget.timeout(stages)
+            try:
+                chunk_responses = get_es().msearch(
+                    chunk, request_timeout=budget.request_timeout(stages)
+                )['responses']
+            except elasticsearch.ConnectionTimeout:
+                # Only the rows of this chunk are left without result.
+                budget.partial = True
+                error = {'error': 'timeout'}
+                chunk_responses = [error] * (len(chunk) // 2)
+            for response in chunk_responses:
+                budget.check(response)
+                responses.append(response)
         fieldnames = headers
         fieldnames.extend(['latitude', 'longitude', 'address'])
         output = io.StringIO()
         writer = csv.DictWriter(output, fieldnames, dialect=dialect)
         writer.writeheader()
         rows = csv.DictReader(content, fieldnames=headers, dialect=dialect)
-        for row, response, q in zip(rows, responses, queries):
+        for row, (q, key) in zip(rows, queries):
+            if keys[key] >= len(responses):
+                writer.writerow(row)
+                continue
+            response = responses[keys[key]]
             if not 'error' in response:
                 if response['hits']['total']:
                     try:
@@ -280,6 +625,8 @@ def _csv():
         response = Response(output.read())
         response.headers['Content-Disposition'] = 'attachment'
         response.headers['Content-Type'] = 'text/csv'
+        if budget.partial:
+            response.headers['X-Partial'] = 'true'
         cors(response)
         return response
     elif request.method == 'OPTIONS':
@@ -301,7 +648,7 @@ def reverse():
     if not lat or not lon:
         abort(400, "missing 'lon' or 'lat': /?lon=2.0984&lat=48.0938")
 
-    s = Search(es).index(INDEX).query(MatchAll()).extra(size=1).sort({
+    s = Search(get_es()).index(INDEX).query(MatchAll()).extra(size=1).sort({
         "_geo_distance": {
             "coordinate": {
                 "lat": lat,
@@ -312,13 +659,24 @@ def reverse():
     _type = request.args.get('type', None)
     if _type:
         s = s.query({'match': {'type': _type}})
-    results = s.execute()
-    if len(results.hits) < 1:
+    budget = TimeBudget(TIME_BUDGET)
+    s = s.extra(timeout=budget.timeout())
+    s = s.params(request_timeout=budget.request_timeout())
+    try:
+        results = s.execute()
+    except elasticsearch.ConnectionTimeout:
+        budget.partial = True
+        hits = []
+    else:
+        budget.check(results)
+        hits = results.hits
+    if len(hits) < 1:
         notfound.debug('reverse: lat: {}, lon: {}, type: {}'.format(
             lat, lon, _type))
 
     debug = 'debug' in request.args
-    data = to_geo_json(results, debug=debug)
+    data = to_geo_json(hits, debug=debug)
+    data['partial'] = budget.partial
     data = json.dumps(data, indent=4 if debug else None)
     response = Response(data, mimetype='application/json')
     cors(response)
@@ -336,8 +694,10 @@ def to_geo_json(hits, debug=False):
             'context', 'ordinal'
         ]
         for attr in flat_keys:
-            if hasattr(hit, attr):
-                properties[attr] = hit[attr]
+            # Works for both DSL results and raw msearch sources.
+            value = hit.get(attr)
+            if value is not None:
+                properties[attr] = value
 
         for attr in ['name', 'city', 'street']:
             obj = hit.get(attr, {})
@@ -374,6 +734,28 @@ def to_geo_json(hits, debug=False):
     }
 
 
+def suggest_to_geo_json(options):
+    features = []
+    for option in options:
+        properties = dict(option['payload'])
+        lon = properties.pop('lon')
+        lat = properties.pop('lat')
+        properties['label'] = option['text']
+        features.append({
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [lon, lat]
+            },
+            "properties": properties
+        })
+
+    return {
+        "type": "FeatureCollection",
+        "features": features
+    }
+
+
 def to_flat_address(hit):
     els = [
         hit.get('housenumber', ''),
@@ -395,21 +777,6 @@ def stdout(*what):
         print(*what)  #noqa
 
 
-def preprocess(q):
-    q = re.sub('(Cedex|Cédex) ?[\d]*', '', q, flags=re.IGNORECASE)
-    q = re.sub('bp ?[\d]*', '', q, flags=re.IGNORECASE)
-    q = re.sub('cs ?[\d]*', '', q, flags=re.IGNORECASE)
-    q = re.sub(' {2,}', ' ', q, flags=re.IGNORECASE)
-    q = q.strip()
-    return q
-
-
-def match_address(q):
-    m = re.search('([\d]*(,? )?(avenue|rue|boulevard|allées?|impasse|place) .*([\d]{5})?).*', q, flags=re.IGNORECASE)
-    if m:
-        return m.group()
-
-
 def cors(response):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Headers"] = "X-Requested-With"
@@ -2,15 +2,22 @@ import csv
 import datetime
 import os
 import sys
-import re
-
-from pathlib import Path
 
 from elasticsearch import Elasticsearch
 from elasticsearch.helpers import bulk_index
 
+from .normalize import SYNONYMS, split_address, split_housenumber
+
+
+_es = None
 
-ES = Elasticsearch()
+
+def get_es():
+    # Created on first use, so that merely importing this module is cheap.
+    global _es
+    if _es is None:
+        _es = Elasticsearch()
+    return _es
 
 
 def timestamp_index(index):
@@ -18,10 +25,10 @@ def timestamp_index(index):
 
 
 def create_index(index):
-    # ES.indices.delete(index, ignore=404)
+    # get_es().indices.delete(index, ignore=404)
     index = timestamp_index(index)
 
-    ES.indices.create(
+    get_es().indices.create(
         index,
         body={'mappings': MAPPINGS, 'settings': {'index': SETTINGS}}
     )
@@ -30,13 +37,13 @@ def create_index(index):
 
 
 def update_aliases(alias, index):
-    olds = ES.indices.get_aliases(alias, ignore=404)
+    olds = get_es().indices.get_aliases(alias, ignore=404)
     actions = []
     for old in olds:
         actions.append({"remove": {'index': old, 'alias': alias}})
     actions.append({"add": {'index': index, 'alias': alias}})
     print('Running update_aliases actions', actions)
-    ES.indices.update_aliases({'actions': actions}, ignore=404)
+    get_es().indices.update_aliases({'actions': actions}, ignore=404)
 
 
 DUMPPATH = os.environ.get('BANO_DUMPPATH', '/tmp')
@@ -44,9 +51,6 @@ FIELDS = [
     'source_id', 'housenumber', 'name', 'postcode', 'city', 'source', 'lat',
     'lon', 'dep', 'region', 'type'
 ]
-DIR = Path(__file__).parent
-
-SYNONYMS = DIR.joinpath('resources', 'synonyms.txt')
 
 
 def row_to_doc(row):
@@ -115,11 +119,44 @@ def row_to_doc(row):
         doc['name'] = {'default': name}
     if way_keywords and 'name' in doc:
         doc['name']['keywords'] = way_keywords
+    if type_ != 'housenumber':
+        doc['suggest'] = to_suggest(doc)
     return doc
 
 
+def to_suggest(doc):
+    # Feed the completion suggester used by /autocomplete/. The FST and the
+    # payloads live in the heap, so housenumbers are left out (they would be
+    # most of the entries) and the payload is kept to what the widget shows
+    # (formatResult in index.html).
+    name = doc['name']['default'] or ''
+    city = doc['city']['default']
+    els = [name, doc['postcode'], city if city != name else '']
+    label = ' '.join([e for e in els if e])
+    inputs = [label]
+    # Completion only matches from the start of an input: also allow
+    # "rivoli paris" for "Rue de Rivoli".
+    for prefix in [name, doc['name'].get('keywords')]:
+        if prefix and prefix != city:
+            inputs.append(' '.join([prefix, city]))
+    return {
+        'input': inputs,
+        'output': label,
+        'payload': {
+            'lat': doc['coordinate']['lat'],
+            'lon': doc['coordinate']['lon'],
+            'type': doc['type'],
+            'postcode': doc['postcode'],
+            'city': city,
+            'context': doc['context'],
+            'name': name,
+        },
+        'weight': int(doc['importance'] * 10) + 1,
+    }
+
+
 def bulk(index, data):
-    bulk_index(ES, data, index=index, doc_type="place", refresh=True)
+    bulk_index(get_es(), data, index=index, doc_type="place", refresh=True)
 
 
 def import_data(index, filepath, limit=None):
@@ -142,32 +179,6 @@ def import_data(index, filepath, limit=None):
             sys.stdout.write("Done {}\n".format(count))
 
 
-TYPES = [
-    'avenue', 'rue', 'boulevard', 'all[ée]es?', 'impasse', 'place',
-    'chemin', 'rocade', 'route', 'l[ôo]tissement', 'mont[ée]e', 'c[ôo]te',
-    'clos', 'champ', 'bois', 'taillis', 'boucle', 'passage', 'domaine',
-    'étang', 'etang', 'quai', 'desserte', 'pré', 'porte', 'square', 'mont',
-    'r[ée]sidence', 'parc', 'cours?', 'promenade', 'hameau', 'faubourg',
-    'ilot', 'berges?', 'via', 'cit[ée]', 'sent(e|ier)', 'rond[- ][Pp]oint',
-    'pas(se)?', 'carrefour', 'traverse', 'giratoire', 'esplanade', 'voie',
-]
-TYPES_REGEX = '|'.join(
-    map(lambda x: '[{}{}]{}'.format(x[0], x[0].upper(), x[1:]), TYPES)
-)
-
-
-def split_address(q):
-    m = re.search(
-        "^(?P<type>" + TYPES_REGEX + ")"
-        "[a-z ']+(?P<name>[\wçàèéuâêôîûöüïäë '\-]+)", q)
-    return m.groupdict() if m else {}
-
-
-def split_housenumber(q):
-    m = re.search("^(?P<number>[\d]+)/?(?P<ordinal>([^\d]+|[\d]{1}))?", q)
-    return m.groupdict() if m else {}
-
-
 MAPPINGS = {
     "place": {
         "dynamic": "false",
@@ -261,6 +272,12 @@ MAPPINGS = {
                 "type": "string",
                 "analyzer": "stringanalyzer",
             },
+            "suggest": {
+                "type": "completion",
+                "index_analyzer": "suggest_analyzer",
+                "search_analyzer": "suggest_analyzer",
+                "payloads": True,
+            },
         }
     }
 }
@@ -305,6 +322,11 @@ SETTINGS = {
                     "word_delimiter", "lowercase", "asciifolding", "wordending"
                 ],
                 "tokenizer": "standard"
+            },
+            "suggest_analyzer": {
+                "char_filter": ["punctuationgreedy"],
+                "filter": ["lowercase", "asciifolding", "synonyms"],
+                "tokenizer": "standard"
             }
         },
         "filter": {
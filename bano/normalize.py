@@ -0,0 +1,143 @@
+"""
+Text normalization shared by the importer and the search API.
+
+All the regexes are compiled once at import time, so the helpers are cheap
+enough to be called on every row of a full import.
+"""
+import re
+import unicodedata
+
+from functools import lru_cache
+from pathlib import Path
+
+
+DIR = Path(__file__).parent
+SYNONYMS = DIR.joinpath('resources', 'synonyms.txt')
+
+TYPES = [
+    'avenue', 'rue', 'boulevard', 'all[ée]es?', 'impasse', 'place',
+    'chemin', 'rocade', 'route', 'l[ôo]tissement', 'mont[ée]e', 'c[ôo]te',
+    'clos', 'champ', 'bois', 'taillis', 'boucle', 'passage', 'domaine',
+    'étang', 'etang', 'quai', 'desserte', 'pré', 'porte', 'square', 'mont',
+    'r[ée]sidence', 'parc', 'cours?', 'promenade', 'hameau', 'faubourg',
+    'ilot', 'berges?', 'via', 'cit[ée]', 'sent(e|ier)', 'rond[- ][Pp]oint',
+    'pas(se)?', 'carrefour', 'traverse', 'giratoire', 'esplanade', 'voie',
+]
+TYPES_REGEX = '|'.join(
+    map(lambda x: '[{}{}]{}'.format(x[0], x[0].upper(), x[1:]), TYPES)
+)
+
+# Not followed by a letter, so "Csardas" is kept but "CS12" is removed.
+POSTAL_BOX_PATTERN = re.compile(r'\b(c[ée]dex|bp|cs)(?![^\W\d_]) ?[\d]*',
+                                re.IGNORECASE)
+SPACES_PATTERN = re.compile(' {2,}')
+NUMBERS_PATTERN = re.compile(r'[\d]*')
+PUNCTUATION_PATTERN = re.compile(r"[^\w]+")
+ADDRESS_PATTERN = re.compile(
+    r'([\d]*(,? )?(avenue|rue|boulevard|all[ée]es?|impasse|place) .*'
+    r'([\d]{5})?).*',
+    flags=re.IGNORECASE
+)
+SPLIT_ADDRESS_PATTERN = re.compile(
+    "^(?P<type>" + TYPES_REGEX + ")"
+    r"[a-z ']+(?P<name>[\wçàèéuâêôîûöüïäë '\-]+)"
+)
+LEADING_HOUSENUMBER_PATTERN = re.compile(
+    r'^\s*\d+\s*(bis|ter|quater)?\b[\s,]*', re.IGNORECASE
+)
+HOUSENUMBER_PATTERN = re.compile(
+    r"^(?P<number>[\d]+)/?(?P<ordinal>([^\d]+|[\d]{1}))?"
+)
+
+
+def load_synonyms(path=SYNONYMS):
+    """Parse a Solr-style synonyms file into a {token: replacement} dict.
+
+    Both "a, b => c" and "a, b, c" (all mapped to "a") forms are supported.
+    Tokens with a digit are skipped: ES splits them (word_delimiter) before
+    applying the synonyms, so "1er" never becomes "premier" in the index.
+    """
+    synonyms = {}
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if '=>' in line:
+                left, right = line.split('=>', 1)
+                right = right.strip()
+            else:
+                left = line
+                right = line.split(',')[0].strip()
+            for token in left.split(','):
+                token = token.strip()
+                if token and not any(c.isdigit() for c in token):
+                    synonyms[token] = right
+    return synonyms
+
+
+_synonyms = None
+
+
+def synonyms():
+    global _synonyms
+    if _synonyms is None:
+        _synonyms = load_synonyms()
+    return _synonyms
+
+
+def preprocess(q):
+    """Remove postal box noise (Cedex, BP, CS) and extra spaces."""
+    q = POSTAL_BOX_PATTERN.sub('', q)
+    q = SPACES_PATTERN.sub(' ', q)
+    return q.strip()
+
+
+def strip_housenumber(q):
+    """Remove the leading housenumber (and its ordinal) of an address."""
+    return LEADING_HOUSENUMBER_PATTERN.sub('', q)
+
+
+def strip_numbers(q):
+    return SPACES_PATTERN.sub(' ', NUMBERS_PATTERN.sub('', q)).strip()
+
+
+def fold(q):
+    """Lowercase, remove accents and punctuation."""
+    q = unicodedata.normalize('NFKD', q.lower())
+    q = ''.join(c for c in q if not unicodedata.combining(c))
+    return PUNCTUATION_PATTERN.sub(' ', q).strip()
+
+
+def expand_synonyms(q):
+    """Replace abbreviations (as listed in synonyms.txt) in a folded string."""
+    mapping = synonyms()
+    return ' '.join(mapping.get(token, token) for token in q.split())
+
+
+@lru_cache(maxsize=100000)
+def canonical_key(q):
+    """Return the canonical form of a query.
+
+    "5 Bd  Sébastopol CEDEX 12" and "5 boulevard sebastopol" give the same
+    key. Queries sharing a key are analyzed the same way by ES, so they can
+    share a cache entry or be deduplicated in batch mode. The key itself is
+    not meant to be sent to ES.
+    """
+    return expand_synonyms(fold(preprocess(q)))
+
+
+def match_address(q):
+    m = ADDRESS_PATTERN.search(q)
+    if m:
+        return m.group()
+
+
+def split_address(q):
+    m = SPLIT_ADDRESS_PATTERN.search(q)
+    return m.groupdict() if m else {}
+
+
+def split_housenumber(q):
+    m = HOUSENUMBER_PATTERN.search(q)
+    return m.groupdict() if m else {}
@@ -16,21 +16,48 @@ Options:
     --index=<string>    index name to use in elasticsearch [default: bano]
     --debug             turn on debug mode [default: False]
     --limit=<number>    add a limit when it makes sense [default: 0]
+    --profile-startup   report import and initialization times
 """
 import os
+import sys
+import time
+
+from contextlib import contextmanager
 
 from docopt import docopt
 
-from bano.es import create_index, import_data, update_aliases
-from bano.app import app
+
+@contextmanager
+def timed(label, enabled):
+    start = time.perf_counter()
+    yield
+    if enabled:
+        sys.stderr.write('{}: {:.1f} ms\n'.format(
+            label, (time.perf_counter() - start) * 1000))
 
 
 if __name__ == '__main__':
     args = docopt(__doc__, version='Bano Search 0.1')
-    app.debug = args['--debug'] or os.environ.get('DEBUG', False)
+    profile = args['--profile-startup']
+    # Subsystems are only imported by the command that needs them: importing
+    # data does not need Flask, serving does not need the importer.
     if args['serve']:
+        with timed('import bano.app', profile):
+            from bano.app import app, get_es
+        if profile:
+            # The client is otherwise created on first use.
+            with timed('create ES client', profile):
+                get_es()
+        app.debug = args['--debug'] or os.environ.get('DEBUG', False)
         app.run(port=int(args['--port']), host=args['--host'])
     elif args['import']:
+        with timed('import bano.es', profile):
+            from bano.es import (create_index, get_es, import_data,
+                                 update_aliases)
+        if profile:
+            # The client is otherwise created on first use.
+            with timed('create ES client', profile):
+                get_es()
         name = create_index(args['--index'])
         if args['--limit']:
             limit = int(args['--limit'])
@@ -0,0 +1,181 @@
+import elasticsearch
+import pytest
+
+import bano.app
+from bano.app import (MIN_STAGE_TIME, TimeBudget, batch_search, make_query,
+                      parse_batch, parse_search_args, search_plan)
+
+
+HIT = {'_source': {
+    'coordinate': {'lat': 48.8, 'lon': 2.3},
+    'type': 'street',
+    'name': {'default': 'Rue de Rivoli'},
+    'postcode': '75001',
+    'city': {'default': 'Paris'},
+}}
+
+
+class FakeES(object):
+
+    def __init__(self, timeouts=0):
+        self.calls = []
+        self.timeouts = timeouts
+
+    def suggest(self, index, body, **kwargs):
+        self.calls.append(body)
+        return {'place': [{'options': [{
+            'text': 'Rue de Rivoli 75001 Paris',
+            'payload': {'lat': 48.8, 'lon': 2.3, 'type': 'street',
+                        'name': 'Rue de Rivoli', 'context': '75, Paris'},
+        }]}]}
+
+    def msearch(self, body, **kwargs):
+        self.calls.append(body)
+        if len(self.calls) <= self.timeouts:
+            raise elasticsearch.ConnectionTimeout('TIMEOUT', 'timed out', None)
+        return {'responses': [{'hits': {'hits': [HIT]}}
+                              for _ in body[1::2]]}
+
+
+@pytest.fixture
+def es(monkeypatch):
+    fake = FakeES()
+    monkeypatch.setattr(bano.app, '_es', fake)
+    return fake
+
+
+def test_search_plan_sends_raw_text():
+    plan = list(search_plan('Rue du 1er Mai Cedex 12'))
+    assert plan[0] == ('Rue du 1er Mai', True, None, 1)
+
+
+def test_search_plan_without_location():
+    plan = list(search_plan('12 rue de la Paix Cedex'))
+    assert [step[2] for step in plan] == [None] * len(plan)
+    assert plan == [
+        ('12 rue de la Paix', True, None, 1),
+        ('rue de la Paix', True, None, 1),
+        ('12 rue de la Paix', False, None, 1),
+    ]
+
+
+def test_search_plan_rings_only_on_first_step():
+    plan = list(search_plan('12 rue de la Paix', lon=2.3, lat=48.8,
+                            limit=15))
+    distances = [step[2] for step in plan]
+    assert distances == ['5km', '50km', None, None, None]
+    assert plan[0] == ('12 rue de la Paix', True, '5km', 5)
+    assert plan[2] == ('12 rue de la Paix', True, None, 1)
+
+
+def test_search_plan_enough_follows_limit():
+    plan = list(search_plan('paris', lon=2.3, lat=48.8, limit=2))
+    assert plan[0][3] == 2
+
+
+def test_make_query_ring_lets_municipalities_through():
+    query = make_query('lyon', lon=2.3, lat=48.8, distance='5km').to_dict()
+    ring = {'or': {'filters': [
+        {'geo_distance': {'distance': '5km',
+                          'coordinate': {'lat': 48.8, 'lon': 2.3}}},
+        {'range': {'importance': {'gt': 0}}},
+    ]}}
+    assert ring in query['query']['filtered']['filter']['bool']['must']
+
+
+def test_parse_batch_json_array():
+    assert parse_batch('[{"q": "paris"}, "lyon"]') == [
+        {'q': 'paris'}, {'q': 'lyon'}]
+
+
+def test_parse_batch_ndjson():
+    assert parse_batch('{"q": "paris"}\n\n{"q": "lyon"}\n') == [
+        {'q': 'paris'}, {'q': 'lyon'}]
+
+
+def test_parse_search_args_converts_numbers():
+    args = parse_search_args({'q': 'rivoli', 'postcode': 75001})
+    assert args[4] == {'postcode': '75001'}
+
+
+def test_parse_search_args_rejects_other_types():
+    with pytest.raises(ValueError):
+        parse_search_args({'q': 'rivoli', 'postcode': ['75001']})
+
+
+def test_parse_search_args_clamps_limit():
+    assert parse_search_args({'q': 'rivoli', 'limit': 0})[3] == 1
+    assert parse_search_args({'q': 'rivoli', 'limit': 500})[3] == 50
+
+
+def test_batch_search_keeps_order_with_invalid_items(es):
+    items = [
+        {'q': 'rue de rivoli'},
+        12,
+        {'q': 123},
+        {'q': 'paris', 'city': ['Paris']},
+        {'q': 'paris', 'postcode': 75001},
+    ]
+    results = list(batch_search(items))
+    assert len(results) == 5
+    assert results[0]['query'] == 'rue de rivoli'
+    assert results[0]['features'][0]['properties']['name'] == 'Rue de Rivoli'
+    assert 'error' in results[1]
+    assert 'error' in results[2]
+    assert 'error' in results[3]
+    assert results[4]['query'] == 'paris'
+
+
+def test_batch_search_dedupes_equivalent_items(es):
+    items = [{'q': '5 Bd Sébastopol'}, {'q': '5 bd sebastopol'}]
+    results = list(batch_search(items))
+    assert len(es.calls) == 1
+    assert len(es.calls[0]) == 2  # One header, one query.
+    assert [r['query'] for r in results] == [
+        '5 Bd Sébastopol', '5 bd sebastopol']
+
+
+def test_batch_search_goes_on_after_a_timeout(monkeypatch):
+    fake = FakeES(timeouts=1)
+    monkeypatch.setattr(bano.app, '_es', fake)
+    results = list(batch_search([{'q': '12 rue de rivoli'}]))
+    assert len(fake.calls) == 2
+    assert results[0]['partial'] is True
+    assert len(results[0]['features']) == 1
+
+
+def test_time_budget_share():
+    budget = TimeBudget(2000)
+    assert 1900 <= budget.share() <= 2000
+    assert 950 <= budget.share(2) <= 1000
+    assert budget.share(1000) == MIN_STAGE_TIME
+    assert budget.allows()
+    assert not budget.partial
+
+
+def test_time_budget_expired():
+    budget = TimeBudget(0)
+    assert budget.share() == 0
+    assert not budget.allows()
+    assert budget.partial
+
+
+def test_time_budget_check():
+    budget = TimeBudget(2000)
+    budget.check({'timed_out': False})
+    assert not budget.partial
+    budget.check({'timed_out': True})
+    assert budget.partial
+
+
+def test_autocomplete_strips_housenumber(es):
+    client = bano.app.app.test_client()
+    response = client.get('/autocomplete/?q=12+rue+de+rivoli&limit=0')
+    assert response.status_code == 200
+    assert es.calls[0]['place'] == {
+        'text': 'rue de rivoli',
+        'completion': {'field': 'suggest', 'size': 1},
+    }
+    feature = response.get_json()['features'][0]
+    assert feature['properties']['context'] == '75, Paris'
+    assert feature['geometry']['coordinates'] == [2.3, 48.8]
@@ -0,0 +1,29 @@
+import pytest
+
+# bano.es relies on bulk_index, which elasticsearch-py dropped in 1.0.
+if not hasattr(pytest.importorskip('elasticsearch.helpers'), 'bulk_index'):
+    pytest.skip('elasticsearch.helpers.bulk_index is not available',
+                allow_module_level=True)
+
+from bano.es import row_to_doc  # noqa
+
+
+ROW = {
+    'source_id': '75101', 'postcode': '75001', 'city': 'Paris',
+    'source': 'OSM', 'lat': '48.86', 'lon': '2.34', 'dep': 'Paris',
+    'region': 'Île-de-France', 'housenumber': '', 'name': 'Rue de Rivoli',
+    'type': 'street',
+}
+
+
+def test_row_to_doc_suggest():
+    suggest = row_to_doc(ROW)['suggest']
+    assert suggest['output'] == 'Rue de Rivoli 75001 Paris'
+    assert suggest['input'] == [
+        'Rue de Rivoli 75001 Paris', 'Rue de Rivoli Paris', 'Rivoli Paris']
+    assert suggest['payload']['context'] == '75, Paris, Île-de-France'
+
+
+def test_row_to_doc_no_suggest_for_housenumbers():
+    doc = row_to_doc(dict(ROW, housenumber='12', type='number'))
+    assert 'suggest' not in doc
@@ -0,0 +1,78 @@
+import pytest
+
+from bano.normalize import (canonical_key, expand_synonyms, fold,
+                            match_address, preprocess, split_address,
+                            split_housenumber, strip_housenumber,
+                            strip_numbers)
+
+
+@pytest.mark.parametrize('query,expected', [
+    ('5 rue de Rivoli Cedex 12', '5 rue de Rivoli'),
+    ('5 rue de Rivoli CÉDEX', '5 rue de Rivoli'),
+    ('BP 123 Paris', 'Paris'),
+    ('CS12 Paris', 'Paris'),
+    ('rue des Csardas', 'rue des Csardas'),
+    ('12 rue BPifrance', '12 rue BPifrance'),
+    ('Route de Csaba', 'Route de Csaba'),
+    ('rue des Ducs', 'rue des Ducs'),
+])
+def test_preprocess(query, expected):
+    assert preprocess(query) == expected
+
+
+def test_strip_numbers():
+    assert strip_numbers('12 rue de Rivoli 75001') == 'rue de Rivoli'
+
+
+@pytest.mark.parametrize('query,expected', [
+    ('12 rue de Rivoli', 'rue de Rivoli'),
+    ('12bis rue de Rivoli', 'rue de Rivoli'),
+    ('12 ter, rue de Rivoli', 'rue de Rivoli'),
+    ('12 r de Rivoli', 'r de Rivoli'),
+    ('12', ''),
+    ('rue du 8 mai', 'rue du 8 mai'),
+])
+def test_strip_housenumber(query, expected):
+    assert strip_housenumber(query) == expected
+
+
+def test_fold():
+    assert fold("Allée de l'Église, Saint-Étienne") == \
+        'allee de l eglise saint etienne'
+
+
+def test_expand_synonyms():
+    assert expand_synonyms('12 bd st michel') == '12 boulevard saint michel'
+
+
+def test_expand_synonyms_keeps_digits():
+    assert expand_synonyms('1 r de la paix') == '1 rue de la paix'
+
+
+def test_canonical_key_keeps_ordinals():
+    # ES splits "1er" into "1" + "er" before the synonyms filter.
+    assert canonical_key('Rue du 1er Mai') == 'rue du 1er mai'
+    assert canonical_key('18e rue') == '18e rue'
+
+
+def test_canonical_key():
+    assert canonical_key('5 Bd  Sébastopol CEDEX 12') == \
+        canonical_key('5 boulevard sebastopol')
+    assert canonical_key('Paris Cedex 12') == 'paris'
+
+
+def test_match_address():
+    assert match_address('Mairie, 12 rue des lilas 75001 paris') == \
+        '12 rue des lilas 75001 paris'
+    assert match_address('12 allees des lilas') == '12 allees des lilas'
+    assert match_address('Mairie de Paris') is None
+
+
+def test_split_address():
+    assert split_address('Rue de la Paix') == {'type': 'Rue', 'name': 'Paix'}
+    assert split_address('Mairie') == {}
+
+
+def test_split_housenumber():
+    assert split_housenumber('12bis') == {'number': '12', 'ordinal': 'bis'}
+    assert split_housenumber('12') == {'number': '12', 'ordinal': None}